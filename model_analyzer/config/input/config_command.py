@@ -74,7 +74,9 @@ def _load_config_file(self, file_path):
         """
 
         with open(file_path, 'r') as config_file:
-            config = yaml.safe_load(config_file)
+            config = yaml.load(config_file,
+                               Loader=getattr(yaml, 'CSafeLoader',
+                                              yaml.SafeLoader))
             return config
 
     def set_config_values(self, args: Namespace) -> None:
@@ -26,6 +26,20 @@
 
 from model_analyzer.triton.server.server_factory import TritonServerFactory
 
+_CUDA_AVAILABLE = None
+
+
+def _cuda_available():
+    """
+    Returns whether CUDA is available, querying
+    the driver only on the first call
+    """
+
+    global _CUDA_AVAILABLE
+    if _CUDA_AVAILABLE is None:
+        _CUDA_AVAILABLE = cuda.is_available()
+    return _CUDA_AVAILABLE
+
 
 class ModelConfig:
     """
@@ -376,8 +390,7 @@ def max_batch_size(self) -> int:
         Returns the max batch size (int)
         """
 
-        model_config = self.get_config()
-        return model_config.get('max_batch_size', 0)
+        return self._model_config.max_batch_size
 
     def dynamic_batching_string(self) -> str:
         """
@@ -388,8 +401,7 @@ def dynamic_batching_string(self) -> str:
             configuration used to generate this result
         """
 
-        model_config = self.get_config()
-        if 'dynamic_batching' in model_config:
+        if self._model_config.HasField('dynamic_batching'):
             return "Enabled"
         else:
             return "Disabled"
@@ -406,7 +418,7 @@ def instance_group_string(self, system_gpu_count: int) -> str:
         model_config = self.get_config()
 
         # TODO change when remote mode is fixed
-        default_kind = 'GPU' if cuda.is_available() else 'CPU'
+        default_kind = 'GPU' if _cuda_available() else 'CPU'
         default_count = 1
 
         instance_group_list: List[Dict[str, Any]] = [{}]
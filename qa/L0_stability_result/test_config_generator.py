@@ -13,7 +13,14 @@
 # limitations under the License.
 
 import argparse
-import yaml
+
+# JSON is a subset of YAML, so config.yaml can be written with orjson.
+# orjson is installed in the QA image; the YAML dumper is only a fallback
+# for running outside of it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class TestConfigGenerator:
@@ -21,24 +28,29 @@ class TestConfigGenerator:
     This class contains functions that
     create configs for various test scenarios.
     
-    The `setup` function does the work common to all tests
+    The `_parse_args` function runs once, and the `_build_config`
+    function does the work common to all tests
 
-    TO ADD A TEST: Simply add a member function whose name starts
-                    with 'generate'.
+    TO ADD A TEST: Simply add a member function and decorate
+                    it with `_generator`.
     """
 
+    _GENERATORS = []
+    _yaml = None
+
+    def _generator(fn, _registry=_GENERATORS):
+        _registry.append(fn)
+        return fn
+
     def __init__(self):
-        test_functions = [
-            self.__getattribute__(name)
-            for name in dir(self)
-            if name.startswith('generate')
-        ]
+        self._parse_args()
 
-        for test_function in test_functions:
-            self.setup()
-            test_function()
+        generators = type(self)._GENERATORS
+        for test_function in generators:
+            self._build_config()
+            test_function(self)
 
-    def setup(self):
+    def _parse_args(self):
         parser = argparse.ArgumentParser()
         parser.add_argument('-m',
                             '--profile-models',
@@ -46,19 +58,48 @@ def setup(self):
                             required=True,
                             help='The models used for this test')
 
-        self.args = parser.parse_args()
-        self.config = {}
-        self.config['profile_models'] = {}
-        for model in sorted(self.args.profile_models.split(',')):
-            self.config['profile_models'][model] = {
-                'objectives': {
-                    'perf_throughput': 10
-                }
+        args = parser.parse_args()
+        self._profile_models = sorted(args.profile_models.split(','))
+
+    def _build_config(self):
+        self.config = {
+            'profile_models': {
+                model: {
+                    'objectives': {
+                        'perf_throughput': 10
+                    }
+                } for model in self._profile_models
             }
+        }
+
+    @classmethod
+    def _load_yaml(cls):
+        # yaml is only needed when orjson is unavailable, so import it lazily
+        if cls._yaml is None:
+            import yaml
+            try:
+                from yaml import CSafeDumper as dumper
+            except ImportError:
+                from yaml import SafeDumper as dumper
+            cls._yaml = (yaml, dumper)
+        return cls._yaml
 
+    @_generator
     def generate_configs(self):
-        with open('config.yaml', 'w+') as f:
-            yaml.dump(self.config, f)
+        if orjson is not None:
+            with open('config.yaml', 'wb') as f:
+                f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+                f.write(b'\n')
+        else:
+            yaml, dumper = self._load_yaml()
+            with open('config.yaml', 'w') as f:
+                yaml.dump(self.config,
+                          f,
+                          Dumper=dumper,
+                          default_flow_style=False,
+                          sort_keys=False)
+
+    del _generator
 
 
 if __name__ == '__main__':
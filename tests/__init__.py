@@ -11,3 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+
+import os
+from importlib.util import find_spec
+
+# Prefer the C++ protobuf backend when it is installed, since parsing model
+# configs with the pure Python backend is much slower. This has to happen
+# before any test module imports google.protobuf.
+try:
+    if find_spec('google.protobuf.pyext._message') is not None:
+        os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'cpp')
+except ImportError:
+    pass
@@ -35,3 +35,10 @@ def start(self):
     def stop(self):
         for patch in self._patchers:
             patch.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
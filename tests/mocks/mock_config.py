@@ -30,3 +30,6 @@ def _fill_patchers(self):
             patch("builtins.open", mock_open(read_data=self.yaml_file_content)))
         patchers.append(patch("sys.argv", self.args))
         patchers.append(patch('numba.cuda.is_available', MagicMock(True)))
+        patchers.append(
+            patch('model_analyzer.triton.model.model_config._cuda_available',
+                  MagicMock(return_value=True)))
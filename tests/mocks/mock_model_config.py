@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from .mock_base import MockBase
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, mock_open, Mock
 
 
 class MockModelConfig(MockBase):
@@ -30,7 +30,7 @@ def _fill_patchers(self):
                   mock_open(read_data=self._model_file_content)))
         patchers.append(
             patch('model_analyzer.triton.model.model_config.os.path.exists',
-                  MagicMock(return_value=True)))
+                  Mock(return_value=True)))
 
         def isfile(file_name):
             if file_name.endswith('.pbtxt'):
@@ -16,17 +16,69 @@
 import os
 from .common import test_result_collector as trc
 from .mocks.mock_model_config import MockModelConfig
-from unittest.mock import mock_open, patch, MagicMock
+from unittest.mock import mock_open, patch, Mock, DEFAULT
+from google.protobuf import text_format
+from tritonclient.grpc import model_config_pb2
 
-from model_analyzer.triton.model.model_config import ModelConfig
+from model_analyzer.triton.model.model_config import ModelConfig, \
+    _cuda_available
 from model_analyzer.model_analyzer_exceptions \
     import TritonModelAnalyzerException
 
+_MODEL_OUTPUT_PATH = os.path.abspath('./model_config')
+
+# (model_config_dict, expected instance_group_string(), system GPU count)
+_INSTANCE_GROUP_CASES = (
+    # No instance group info in model_config_dict:
+    #  - default to 1 per GPU
+    ({}, "1:GPU", 1),
+    # No instance group info in model_config_dict:
+    #  - 1 per GPU -- if 2 gpus then 2 total
+    ({}, "2:GPU", 2),
+    # 2 per GPU, 3 gpus in the system = 6 total
+    ({
+        'instance_group': [{
+            'count': 2,
+            'kind': 'KIND_GPU',
+        }]
+    }, "6:GPU", 3),
+    # 1 on GPU0 only = 1 total despite 2 GPUs in the system
+    ({
+        'instance_group': [{
+            'count': 1,
+            'kind': 'KIND_GPU',
+            'gpus': [0]
+        }]
+    }, "1:GPU", 2),
+    # 1 on ALL gpus + 2 each on [1 and 3] + 3 more on CPUs
+    # with 4 GPUs in the system:
+    #   8 on GPU and 3 on CPU
+    ({
+        'instance_group': [
+            {
+                'count': 1,
+                'kind': 'KIND_GPU'
+            },
+            {
+                'count': 2,
+                'kind': 'KIND_GPU',
+                'gpus': [1, 3]
+            },
+            {
+                'count': 3,
+                'kind': 'KIND_CPU'
+            },
+        ]
+    }, "8:GPU + 3:CPU", 4),
+)
+
 
 class TestModelConfig(trc.TestResultCollector):
 
-    def setUp(self):
-        self._model_config = {
+    @classmethod
+    def setUpClass(cls):
+        # Shared by every test, so they must be treated as read-only
+        cls._MODEL_CONFIG_TEMPLATE = {
             'name': 'classification_chestxray_v1',
             'platform': 'tensorflow_graphdef',
             'max_batch_size': 32,
@@ -49,7 +101,7 @@ def setUp(self):
         }
 
         # Equivalent protobuf for the model config above.
-        self._model_config_protobuf = """
+        cls._MODEL_CONFIG_PROTOBUF = """
 name: "classification_chestxray_v1"
 platform: "tensorflow_graphdef"
 max_batch_size: 32
@@ -77,16 +129,19 @@ def setUp(self):
 ]
 """
 
-    def tearDown(self):
-        patch.stopall()
+        # Parse the protobuf fixture once; the write tests reuse the result
+        with MockModelConfig(cls._MODEL_CONFIG_PROTOBUF):
+            cls._FIXTURE_MODEL_CONFIG = \
+                ModelConfig._create_from_file('/path/to/model_config')
+
+    def setUp(self):
+        self._model_config = self._MODEL_CONFIG_TEMPLATE
 
     def test_create_from_file(self):
-        test_protobuf = self._model_config_protobuf
-        mock_model_config = MockModelConfig(test_protobuf)
-        mock_model_config.start()
-        model_config = ModelConfig._create_from_file('/path/to/model_config')
+        with MockModelConfig(self._MODEL_CONFIG_PROTOBUF):
+            model_config = \
+                ModelConfig._create_from_file('/path/to/model_config')
         self.assertTrue(model_config.get_config() == self._model_config)
-        mock_model_config.stop()
 
     def test_create_from_dict(self):
         model_config = ModelConfig.create_from_dictionary(self._model_config)
@@ -97,71 +152,83 @@ def test_create_from_dict(self):
         self.assertTrue(model_config.get_config() == new_config)
 
     def test_write_config_file(self):
-        model_config = ModelConfig.create_from_dictionary(self._model_config)
-        model_output_path = os.path.abspath('./model_config')
+        model_config = self._FIXTURE_MODEL_CONFIG
 
-        mock_model_config = MockModelConfig()
-        mock_model_config.start()
         # Write the model config to output
-        with patch('model_analyzer.triton.model.model_config.open',
-                   mock_open()) as mocked_file:
+        with MockModelConfig(), \
+                patch('model_analyzer.triton.model.model_config.open',
+                      mock_open()) as mocked_file:
             with patch('model_analyzer.triton.model.model_config.copy_tree',
-                       MagicMock()):
-                model_config.write_config_to_file(model_output_path,
+                       Mock()):
+                model_config.write_config_to_file(_MODEL_OUTPUT_PATH,
                                                   '/mock/path', None)
             content = mocked_file().write.call_args.args[0]
-        mock_model_config.stop()
 
-        mock_model_config = MockModelConfig(content)
-        mock_model_config.start()
-        model_config_from_file = \
-            ModelConfig._create_from_file(model_output_path)
+        model_config_from_file = ModelConfig(
+            text_format.Parse(content, model_config_pb2.ModelConfig()))
         self.assertTrue(
             model_config_from_file.get_config() == self._model_config)
-        mock_model_config.stop()
 
         # output path doesn't exist
         with patch('model_analyzer.triton.model.model_config.os.path.exists',
-                   MagicMock(return_value=False)):
+                   Mock(return_value=False)):
             with self.assertRaises(TritonModelAnalyzerException):
-                ModelConfig._create_from_file(model_output_path)
+                ModelConfig._create_from_file(_MODEL_OUTPUT_PATH)
 
         # output path is a file
         with patch('model_analyzer.triton.model.model_config.os.path.isfile',
-                   MagicMock(return_value=True)):
+                   Mock(return_value=True)):
             with self.assertRaises(TritonModelAnalyzerException):
-                ModelConfig._create_from_file(model_output_path)
-
-    @patch('model_analyzer.triton.model.model_config.os.listdir',
-           MagicMock(return_value=['1', 'config.pbtxt', 'output0_labels.txt']))
-    @patch('model_analyzer.triton.model.model_config.copy_tree')
-    @patch('model_analyzer.triton.model.model_config.os.symlink')
-    def test_write_config_to_file_with_relative_path(self, mock_os_symlink,
-                                                     *args):
+                ModelConfig._create_from_file(_MODEL_OUTPUT_PATH)
+
+    @patch.multiple(
+        'model_analyzer.triton.model.model_config.os',
+        listdir=Mock(return_value=['1', 'config.pbtxt', 'output0_labels.txt']),
+        symlink=DEFAULT)
+    @patch('model_analyzer.triton.model.model_config.copy_tree',
+           new_callable=Mock)
+    def test_write_config_to_file_with_relative_path(self, *args, symlink):
         """
         Tests that the call to os.symlink() within write_config_to_file() uses
         a valid relative path when user uses a relative path with the
         `--output-model-repository-path` option
         """
 
-        model_config = ModelConfig.create_from_dictionary(self._model_config)
+        model_config = self._FIXTURE_MODEL_CONFIG
 
         model_path = './output_model_repository/model_config_1'
         src_model_path = '/tmp/src_model_repository/model'
         last_model_path = './output_model_repository/model_config_0'
 
-        mock_model_config = MockModelConfig()
-        mock_model_config.start()
-        model_config.write_config_to_file(model_path, src_model_path,
-                                          last_model_path)
-        mock_model_config.stop()
+        with MockModelConfig():
+            model_config.write_config_to_file(model_path, src_model_path,
+                                              last_model_path)
 
-        mock_os_symlink.assert_any_call(
-            '../model_config_0/1', './output_model_repository/model_config_1/1')
-        mock_os_symlink.assert_any_call(
+        symlink.assert_any_call('../model_config_0/1',
+                                './output_model_repository/model_config_1/1')
+        symlink.assert_any_call(
             '../model_config_0/output0_labels.txt',
             './output_model_repository/model_config_1/output0_labels.txt')
 
+    def test_max_batch_size(self):
+        """ Test max_batch_size() with the field unset and set """
+
+        model_config = ModelConfig.create_from_dictionary({})
+        self.assertEqual(model_config.max_batch_size(), 0)
+
+        model_config = ModelConfig.create_from_dictionary(self._model_config)
+        self.assertEqual(model_config.max_batch_size(), 32)
+
+    def test_dynamic_batching_string(self):
+        """ Test dynamic_batching_string() with the field absent and empty """
+
+        model_config = ModelConfig.create_from_dictionary({})
+        self.assertEqual(model_config.dynamic_batching_string(), "Disabled")
+
+        model_config = ModelConfig.create_from_dictionary(
+            {'dynamic_batching': {}})
+        self.assertEqual(model_config.dynamic_batching_string(), "Enabled")
+
     def test_instance_group_string(self):
         """ Test out all corner cases of instance_group_string() """
 
@@ -174,62 +241,32 @@ def _test_helper(config_dict, expected_result, gpu_count=None):
                 instance_group_str = model_config.instance_group_string()
             self.assertEqual(instance_group_str, expected_result)
 
-        # No instance group info in model_config_dict:
-        #  - default to 1 per GPU
-        model_config_dict = {}
-        _test_helper(model_config_dict, "1:GPU", gpu_count=1)
-
-        # No instance group info in model_config_dict:
-        #  - 1 per GPU -- if 2 gpus then 2 total
-        model_config_dict = {}
-        _test_helper(model_config_dict, "2:GPU", gpu_count=2)
+        with patch('model_analyzer.triton.model.model_config._cuda_available',
+                   Mock(return_value=True)):
+            for config_dict, expected_result, gpu_count in \
+                    _INSTANCE_GROUP_CASES:
+                with self.subTest(config_dict=config_dict, gpu_count=gpu_count):
+                    _test_helper(config_dict,
+                                 expected_result,
+                                 gpu_count=gpu_count)
 
         # No instance group info in model_config_dict:
         #  - default to 1 on CPU if cuda not available
         model_config_dict = {}
-        with patch('numba.cuda.is_available', MagicMock(return_value=False)):
+        with patch('model_analyzer.triton.model.model_config._cuda_available',
+                   Mock(return_value=False)):
             _test_helper(model_config_dict, "1:CPU", gpu_count=5)
 
-        # 2 per GPU, 3 gpus in the system = 6 total
-        model_config_dict = {
-            'instance_group': [{
-                'count': 2,
-                'kind': 'KIND_GPU',
-            }]
-        }
-        _test_helper(model_config_dict, "6:GPU", gpu_count=3)
+    def test_cuda_available_is_cached(self):
+        """ Test that the CUDA driver is only queried on the first call """
 
-        # 1 on GPU0 only = 1 total despite 2 GPUs in the system
-        model_config_dict = {
-            'instance_group': [{
-                'count': 1,
-                'kind': 'KIND_GPU',
-                'gpus': [0]
-            }]
-        }
-        _test_helper(model_config_dict, "1:GPU", gpu_count=2)
-
-        # 1 on ALL gpus + 2 each on [1 and 3] + 3 more on CPUs
-        # with 4 GPUs in the system:
-        #   8 on GPU and 3 on CPU
-        model_config_dict = {
-            'instance_group': [
-                {
-                    'count': 1,
-                    'kind': 'KIND_GPU'
-                },
-                {
-                    'count': 2,
-                    'kind': 'KIND_GPU',
-                    'gpus': [1, 3]
-                },
-                {
-                    'count': 3,
-                    'kind': 'KIND_CPU'
-                },
-            ]
-        }
-        _test_helper(model_config_dict, "8:GPU + 3:CPU", gpu_count=4)
+        model_config_module = 'model_analyzer.triton.model.model_config'
+        with patch(f'{model_config_module}._CUDA_AVAILABLE', None):
+            with patch(f'{model_config_module}.cuda.is_available',
+                       Mock(return_value=False)) as mock_is_available:
+                self.assertFalse(_cuda_available())
+                self.assertFalse(_cuda_available())
+                mock_is_available.assert_called_once()
 
 
 if __name__ == '__main__':